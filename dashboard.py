@@ -8,13 +8,24 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
+import plotly.io as pio
 from data_loader import (
     load_ablation_data, 
     get_available_instances, 
     get_iteration_data,
-    get_summary_stats
+    get_summary_stats,
+    build_comparison_frame,
+    get_valid_positions,
+    lttb_indices
 )
 
+# Serialize figures with orjson, which emits numpy arrays as typed arrays
+try:
+    import orjson  # noqa: F401
+    pio.json.config.default_engine = 'orjson'
+except ImportError:
+    pass
+
 # Page configuration
 st.set_page_config(
     page_title="VRPTW Ablation Analysis Dashboard",
@@ -32,7 +43,7 @@ def load_data():
     return load_ablation_data()
 
 try:
-    df = load_data()
+    df, summary_index, iter_map, valid_map = load_data()
     if df.empty:
         st.error("No data loaded. Please check the data directory.")
         st.stop()
@@ -79,60 +90,79 @@ viz_type = st.sidebar.selectbox(
 )
 
 # Get data for selected instance and condition
-iteration_data = get_iteration_data(df, selected_instance, selected_condition)
-summary_stats = get_summary_stats(df, selected_instance, selected_condition)
+iteration_data = get_iteration_data(iter_map, selected_num_cust, selected_instance, selected_condition)
+valid_idx = valid_map.get((selected_num_cust, selected_instance, selected_condition))
+summary_stats = get_summary_stats(summary_index, iter_map, selected_num_cust, selected_instance, selected_condition)
 
 if iteration_data is None or iteration_data.empty:
     st.error(f"No iteration data found for {selected_instance} with {selected_condition} condition")
     st.stop()
 
 # Statistics sidebar
+STAT_FORMATS = {
+    'Root LP': '{:.2f}',
+    'Final LB': '{:.2f}',
+    'ILP Objective': '{:.2f}',
+    'LB Improvement': '{:.2f}',
+    'ILP Time': '{:.3f}s',
+    'Total LP Time': '{:.3f}s'
+}
+
 st.sidebar.header("📊 Statistics")
-for stat_name, stat_value in summary_stats.items():
-    if pd.notna(stat_value):
-        if stat_name in ['Root LP', 'Final LB', 'ILP Objective', 'LB Improvement']:
-            st.sidebar.metric(stat_name, f"{stat_value:.2f}")
-        elif stat_name in ['ILP Time', 'Total LP Time']:
-            st.sidebar.metric(stat_name, f"{stat_value:.3f}s")
-        else:
-            st.sidebar.metric(stat_name, f"{stat_value}")
+# One HTML table instead of a metric element per statistic
+stat_rows = "".join(
+    f"<tr><td>{stat_name}</td><td><b>{STAT_FORMATS.get(stat_name, '{}').format(stat_value)}</b></td></tr>"
+    for stat_name, stat_value in summary_stats.items()
+    if pd.notna(stat_value)
+)
+st.sidebar.markdown(f"<table style='width:100%'>{stat_rows}</table>", unsafe_allow_html=True)
 
 # Main visualization area
 st.header(f"📈 {viz_type}")
 st.subheader(f"Instance: {selected_instance} | Condition: {selected_condition} | Customers: {selected_num_cust}")
 
-def create_lp_convergence_plot(data, time_based=False):
-    """Create LP convergence plot (iteration or time-based)"""
+@st.cache_resource
+def create_lp_convergence_plot(_data, _valid_idx, num_cust, instance, condition, time_based=False):
+    """Create LP convergence plot (iteration or time-based).
+    Cached per (num_cust, instance, condition); _data and _valid_idx are not hashed.
+    cache_resource hands back the same Figure without unpickling it; do not modify it."""
     fig = go.Figure()
     
     x_col = 'cumulative_time' if time_based else 'iteration'
     x_title = 'Cumulative Time (seconds)' if time_based else 'Iteration'
     
-    # Filter out NaN values
-    valid_data = data.dropna(subset=['lblp_lower', x_col])
+    # Rows with both an LP bound and an x value (positions precomputed at load).
+    # Traces get contiguous float32 arrays rather than Series, which Plotly
+    # would otherwise serialize point by point.
+    valid = get_valid_positions(_data, ['lblp_lower', x_col], _valid_idx)
     
-    if valid_data.empty:
+    if len(valid) == 0:
         st.warning("No valid data for LP convergence plot")
         return fig
     
     # LP Lower Bound
-    if 'lblp_lower' in valid_data.columns:
-        fig.add_trace(go.Scatter(
-            x=valid_data[x_col],
-            y=valid_data['lblp_lower'],
-            mode='lines+markers',
-            name='LP Lower Bound',
-            line=dict(color='blue', width=2),
-            marker=dict(size=6)
-        ))
+    x = _data[x_col].to_numpy(dtype=np.float32)[valid]
+    lb = _data['lblp_lower'].to_numpy(dtype=np.float32)[valid]
+    keep = lttb_indices(x, lb)
+    fig.add_trace(go.Scattergl(
+        x=x[keep],
+        y=lb[keep],
+        mode='lines+markers',
+        name='LP Lower Bound',
+        line=dict(color='blue', width=2),
+        marker=dict(size=6)
+    ))
     
     # Upper Bound (if available)
-    if 'ub_lp' in valid_data.columns:
-        ub_data = valid_data.dropna(subset=['ub_lp'])
-        if not ub_data.empty:
-            fig.add_trace(go.Scatter(
-                x=ub_data[x_col],
-                y=ub_data['ub_lp'],
+    if 'ub_lp' in _data.columns:
+        ub_valid = get_valid_positions(_data, ['lblp_lower', x_col, 'ub_lp'], _valid_idx)
+        if len(ub_valid):
+            x = _data[x_col].to_numpy(dtype=np.float32)[ub_valid]
+            ub = _data['ub_lp'].to_numpy(dtype=np.float32)[ub_valid]
+            keep = lttb_indices(x, ub)
+            fig.add_trace(go.Scattergl(
+                x=x[keep],
+                y=ub[keep],
                 mode='lines+markers',
                 name='Upper Bound',
                 line=dict(color='red', width=2),
@@ -140,16 +170,14 @@ def create_lp_convergence_plot(data, time_based=False):
             ))
     
     # Mark when cuts start (if applicable)
-    if 'cut_TOT_gen_cut' in valid_data.columns:
-        first_cut_iter = valid_data[valid_data['cut_TOT_gen_cut'] > 0]
-        if not first_cut_iter.empty:
-            cut_start = first_cut_iter.iloc[0][x_col]
-            fig.add_vline(
-                x=cut_start,
-                line_dash="dash",
-                line_color="green",
-                annotation_text="Cuts Start"
-            )
+    cut_start = _data.attrs.get('first_cut_cumtime' if time_based else 'first_cut_iter')
+    if cut_start is not None:
+        fig.add_vline(
+            x=cut_start,
+            line_dash="dash",
+            line_color="green",
+            annotation_text="Cuts Start"
+        )
     
     fig.update_layout(
         title=f"LP Convergence ({'Time-based' if time_based else 'Iteration-based'})",
@@ -161,8 +189,11 @@ def create_lp_convergence_plot(data, time_based=False):
     
     return fig
 
-def create_graph_evolution_plot(data, graph_type="time"):
-    """Create graph size evolution plot"""
+@st.cache_resource
+def create_graph_evolution_plot(_data, _valid_idx, num_cust, instance, condition, graph_type="time"):
+    """Create graph size evolution plot.
+    Cached per (num_cust, instance, condition); _data and _valid_idx are not hashed.
+    cache_resource hands back the same Figure without unpickling it; do not modify it."""
     fig = go.Figure()
     
     # Define columns based on graph type
@@ -177,10 +208,8 @@ def create_graph_evolution_plot(data, graph_type="time"):
         split_col = 'split_ngGraph'
         title_prefix = "NG Graph"
     
-    # Filter out NaN values for iteration column
-    valid_data = data.dropna(subset=['iteration'])
-    
-    if valid_data.empty:
+    # Rows with an iteration number (positions precomputed at load)
+    if len(get_valid_positions(_data, ['iteration'], _valid_idx)) == 0:
         st.warning(f"No valid data for {title_prefix} evolution plot")
         return fig
     
@@ -190,12 +219,15 @@ def create_graph_evolution_plot(data, graph_type="time"):
         (compress_col, f'{title_prefix} Compress', 'orange'),
         (split_col, f'{title_prefix} Split', 'green')
     ]:
-        if col in valid_data.columns:
-            stage_data = valid_data.dropna(subset=[col])
-            if not stage_data.empty:
-                fig.add_trace(go.Scatter(
-                    x=stage_data['iteration'],
-                    y=stage_data[col],
+        if col in _data.columns:
+            stage_valid = get_valid_positions(_data, ['iteration', col], _valid_idx)
+            if len(stage_valid):
+                x = _data['iteration'].to_numpy(dtype=np.float32)[stage_valid]
+                sizes = _data[col].to_numpy(dtype=np.float32)[stage_valid]
+                keep = lttb_indices(x, sizes)
+                fig.add_trace(go.Scattergl(
+                    x=x[keep],
+                    y=sizes[keep],
                     mode='lines+markers',
                     name=name,
                     line=dict(color=color, width=2),
@@ -203,16 +235,14 @@ def create_graph_evolution_plot(data, graph_type="time"):
                 ))
     
     # Mark when cuts start (if applicable)
-    if 'cut_TOT_gen_cut' in valid_data.columns:
-        first_cut_iter = valid_data[valid_data['cut_TOT_gen_cut'] > 0]
-        if not first_cut_iter.empty:
-            cut_start = first_cut_iter.iloc[0]['iteration']
-            fig.add_vline(
-                x=cut_start,
-                line_dash="dash",
-                line_color="red",
-                annotation_text="Cuts Start"
-            )
+    cut_start = _data.attrs.get('first_cut_iter')
+    if cut_start is not None:
+        fig.add_vline(
+            x=cut_start,
+            line_dash="dash",
+            line_color="red",
+            annotation_text="Cuts Start"
+        )
     
     fig.update_layout(
         title=f"{title_prefix} Size Evolution",
@@ -226,81 +256,125 @@ def create_graph_evolution_plot(data, graph_type="time"):
 
 # Create and display the appropriate visualization
 if viz_type == "LP Convergence (Iterations)":
-    fig = create_lp_convergence_plot(iteration_data, time_based=False)
+    fig = create_lp_convergence_plot(iteration_data, valid_idx, selected_num_cust, selected_instance, selected_condition, time_based=False)
 elif viz_type == "LP Convergence (Time)":
-    fig = create_lp_convergence_plot(iteration_data, time_based=True)
+    fig = create_lp_convergence_plot(iteration_data, valid_idx, selected_num_cust, selected_instance, selected_condition, time_based=True)
 elif viz_type == "Time Graph Evolution":
-    fig = create_graph_evolution_plot(iteration_data, graph_type="time")
+    fig = create_graph_evolution_plot(iteration_data, valid_idx, selected_num_cust, selected_instance, selected_condition, graph_type="time")
 elif viz_type == "NG Graph Evolution":
-    fig = create_graph_evolution_plot(iteration_data, graph_type="ng")
+    fig = create_graph_evolution_plot(iteration_data, valid_idx, selected_num_cust, selected_instance, selected_condition, graph_type="ng")
 
 st.plotly_chart(fig, use_container_width=True)
 
 # Data exploration section
+RAW_PAGE_SIZE = 200
+
 with st.expander("🔍 Raw Iteration Data"):
     st.subheader("Iteration-level Data")
     
-    # Display key columns
-    display_cols = ['iteration', 'lblp_lower', 'ub_lp', 'lp_time_LB', 'lp_time_project', 'cumulative_time']
-    
-    # Add graph size columns if they exist
-    for col in ['start_timeGraph', 'compress_timeGraph', 'split_timeGraph', 
-                'start_ngGraph', 'compress_ngGraph', 'split_ngGraph']:
-        if col in iteration_data.columns:
-            display_cols.append(col)
-    
-    # Add cutting plane columns if they exist
-    for col in ['cut_tot_cut_value', 'cut_TOT_gen_cut', 'cut_tot_time_opt']:
-        if col in iteration_data.columns:
-            display_cols.append(col)
-    
-    # Filter to available columns
-    available_display_cols = [col for col in display_cols if col in iteration_data.columns]
-    
-    if available_display_cols:
-        st.dataframe(iteration_data[available_display_cols], use_container_width=True)
-    else:
-        st.warning("No displayable columns found in iteration data")
+    # Expander contents are always sent to the browser, so the table is opt-in
+    if st.checkbox("Show raw data", key='show_raw'):
+        # Display key columns
+        display_cols = ['iteration', 'lblp_lower', 'ub_lp', 'lp_time_LB', 'lp_time_project', 'cumulative_time']
+        
+        # Add graph size columns if they exist
+        for col in ['start_timeGraph', 'compress_timeGraph', 'split_timeGraph', 
+                    'start_ngGraph', 'compress_ngGraph', 'split_ngGraph']:
+            if col in iteration_data.columns:
+                display_cols.append(col)
+        
+        # Add cutting plane columns if they exist
+        for col in ['cut_tot_cut_value', 'cut_TOT_gen_cut', 'cut_tot_time_opt']:
+            if col in iteration_data.columns:
+                display_cols.append(col)
+        
+        # Filter to available columns
+        available_display_cols = [col for col in display_cols if col in iteration_data.columns]
+        
+        if available_display_cols:
+            # Paginate so only one page of rows is serialized per rerun
+            num_pages = max(1, (len(iteration_data) + RAW_PAGE_SIZE - 1) // RAW_PAGE_SIZE)
+            page = st.number_input("Page", min_value=1, max_value=num_pages, value=1, step=1)
+            start = (page - 1) * RAW_PAGE_SIZE
+            end = min(start + RAW_PAGE_SIZE, len(iteration_data))
+            
+            st.caption(f"Rows {start + 1}-{end} of {len(iteration_data)}")
+            st.dataframe(
+                iteration_data[available_display_cols].iloc[start:end],
+                use_container_width=True
+            )
+        else:
+            st.warning("No displayable columns found in iteration data")
 
 # Comparison section
-st.header("🔄 Compare Conditions")
+with st.expander("🔄 Compare Conditions", expanded=False):
+    # Multi-select for conditions
+    comparison_conditions = st.multiselect(
+        "Select conditions to compare:",
+        available_conditions,
+        default=[selected_condition] if len(available_conditions) > 1 else available_conditions[:1]
+    )
 
-# Multi-select for conditions
-comparison_conditions = st.multiselect(
-    "Select conditions to compare:",
-    available_conditions,
-    default=[selected_condition] if len(available_conditions) > 1 else available_conditions[:1]
-)
+    # The comparison plot is only built on demand
+    if st.button("Build comparison plot"):
+        st.session_state['cmp_built'] = True
 
-if len(comparison_conditions) > 1:
-    # Create comparison plot
-    fig_comparison = go.Figure()
-    
-    colors = px.colors.qualitative.Set1
-    
-    for i, condition in enumerate(comparison_conditions):
-        comp_data = get_iteration_data(df, selected_instance, condition)
-        if comp_data is not None and not comp_data.empty:
-            valid_data = comp_data.dropna(subset=['lblp_lower', 'iteration'])
-            if not valid_data.empty:
-                fig_comparison.add_trace(go.Scatter(
-                    x=valid_data['iteration'],
-                    y=valid_data['lblp_lower'],
-                    mode='lines+markers',
+    if st.session_state.get('cmp_built') and len(comparison_conditions) < 2:
+        st.info("Select at least two conditions to build the comparison plot.")
+
+    if st.session_state.get('cmp_built') and len(comparison_conditions) > 1:
+        # Create comparison plot
+        fig_comparison = go.Figure()
+        
+        colors = px.colors.qualitative.Set1
+        condition_colors = {
+            condition: colors[i % len(colors)] for i, condition in enumerate(comparison_conditions)
+        }
+        
+        comparison_data = build_comparison_frame(iter_map, valid_map, selected_num_cust, selected_instance, tuple(comparison_conditions))
+        
+        if not comparison_data.empty:
+            # Trailing NaN row breaks the line between consecutive conditions
+            gaps = comparison_data.groupby('condition', sort=False).tail(1).assign(
+                iteration=np.nan, lblp_lower=np.nan
+            )
+            plot_data = pd.concat([comparison_data, gaps]).sort_index(kind='stable')
+            
+            # Legend-only entries acting as a color key; the points live in the combined trace
+            for condition in plot_data['condition'].unique():
+                fig_comparison.add_trace(go.Scattergl(
+                    x=[None],
+                    y=[None],
+                    mode='markers',
                     name=f'{condition}',
-                    line=dict(color=colors[i % len(colors)], width=2),
-                    marker=dict(size=4)
+                    marker=dict(color=condition_colors[condition], size=8)
                 ))
-    
-    fig_comparison.update_layout(
-        title=f"LP Lower Bound Comparison - {selected_instance}",
-        xaxis_title="Iteration",
-        yaxis_title="LP Lower Bound",
-        showlegend=True,
-        hovermode='x unified'
-    )
-    
-    st.plotly_chart(fig_comparison, use_container_width=True)
+            
+            # All conditions share one WebGL trace. Markers are colored per point;
+            # the connecting line stays gray, as a trace has a single line color
+            fig_comparison.add_trace(go.Scattergl(
+                x=plot_data['iteration'].to_numpy(dtype=np.float32),
+                y=plot_data['lblp_lower'].to_numpy(dtype=np.float32),
+                mode='lines+markers',
+                line=dict(color='lightgray', width=1),
+                marker=dict(color=plot_data['condition'].map(condition_colors).tolist(), size=4),
+                customdata=plot_data['condition'].to_numpy(),
+                hovertemplate='%{customdata}<br>Iteration %{x}<br>LP Lower Bound %{y:.2f}<extra></extra>',
+                showlegend=False
+            ))
+        
+        fig_comparison.update_layout(
+            title=f"LP Lower Bound Comparison - {selected_instance}",
+            xaxis_title="Iteration",
+            yaxis_title="LP Lower Bound",
+            showlegend=True,
+            # Clicking an entry cannot hide part of the combined trace, so legend
+            # clicks are disabled; conditions are chosen in the multiselect
+            legend=dict(itemclick=False, itemdoubleclick=False),
+            hovermode='closest'
+        )
+        
+        st.plotly_chart(fig_comparison, use_container_width=True)
 
 # Footer
 st.markdown("---")
@@ -3,38 +3,94 @@ Data loader for ablation analysis dashboard.
 Processes JSON experiment files from Sept_19/WillRezAbl directory structure.
 """
 
+import hashlib
 import json
+import mmap
+import multiprocessing
+import os
 import pandas as pd
 import numpy as np
 from pathlib import Path
 import re
-from typing import Dict, List, Optional, Union
+import sys
+import types
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple, Union
 import streamlit as st
 
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
 
-def parse_custom_json(json_text: str) -> dict:
-    """
-    Enhanced JSON parsing function that handles NaN and Infinity values.
-    Similar to the R function in ablation.qmd.
-    """
-    # Replace problematic values with null
-    json_text_fixed = json_text
-    json_text_fixed = re.sub(r'\bNaN\b', 'null', json_text_fixed)
-    json_text_fixed = re.sub(r'\bInfinity\b', 'null', json_text_fixed)
-    json_text_fixed = re.sub(r'\b-Infinity\b', 'null', json_text_fixed)
-    json_text_fixed = re.sub(r'\b-?Inf\b', 'null', json_text_fixed)
-    
-    return json.loads(json_text_fixed)
+
+# NaN/Infinity tokens (optionally negative) that standard JSON cannot represent
+_BAD_JSON_RE = re.compile(rb'-?\b(?:NaN|Infinity|Inf)\b')
+
+# Summary columns shown in the statistics panel, with their display labels
+SUMMARY_STAT_LABELS = {
+    'root_lp': 'Root LP',
+    'final_lb': 'Final LB',
+    'ilp_objective': 'ILP Objective',
+    'ilp_time': 'ILP Time',
+    'total_lp_time': 'Total LP Time',
+    'iterations': 'Iterations',
+    'total_cuts': 'Total Cuts',
+}
+
+# Traces longer than this are downsampled before plotting
+MAX_PLOT_POINTS = 2000
+
+# Column dtypes of the summary DataFrame returned by load_ablation_data
+SUMMARY_DTYPES = {
+    'dataset': str,
+    'num_cust': 'int64',
+    'instance_type': str,
+    'condition': str,
+    'instance': str,
+    'root_lp': 'float64',
+    'final_lb': 'float64',
+    'ilp_objective': 'float64',
+    'ilp_time': 'float64',
+    'total_lp_time': 'float64',
+    'iterations': 'int64',
+    'total_cuts': 'int64',
+}
+
+# Iteration columns that are plotted, with NaN positions precomputed at load
+PLOT_COLUMNS = [
+    'iteration', 'lblp_lower', 'ub_lp', 'cumulative_time',
+    'start_timeGraph', 'compress_timeGraph', 'split_timeGraph',
+    'start_ngGraph', 'compress_ngGraph', 'split_ngGraph'
+]
+
+# Below this many files a worker pool costs more to start than it saves
+MIN_PARALLEL_TASKS = 32
+
+# Bump when the on-disk cache format changes
+CACHE_VERSION = 2
+
+# Columns added to the cached long-format iteration table: the experiment
+# key, and the per-run scalars kept in DataFrame.attrs in memory
+CACHE_KEY_COLUMNS = ['num_cust', 'instance', 'condition']
+CACHE_RUN_COLUMNS = ['first_cut_iter', 'first_cut_cumtime']
+
+# Integer-valued iteration columns that may contain missing values
+NULLABLE_INT_COLUMNS = ['did_compress', 'cut_TOT_gen_cut']
 
 
 def read_one_file(file_path: Union[str, Path]) -> dict:
     """
     Read a single JSON file with error handling.
+    NaN and Infinity values are replaced with null (as in the R parser in
+    ablation.qmd); the file is memory-mapped and cleaned as bytes.
     """
     try:
-        with open(file_path, 'r') as f:
-            content = f.read()
-        return parse_custom_json(content)
+        with open(file_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return _loads(_BAD_JSON_RE.sub(b'null', mm))
     except Exception as e:
         print(f"Error reading {file_path}: {e}")
         return {}
@@ -65,6 +121,15 @@ def extract_instance_name(filename: str) -> str:
     return base_name
 
 
+def normalize_records(records: list, fields: List[str]) -> Dict[str, list]:
+    """
+    Flatten a list of per-iteration dictionaries into one list per field.
+    Non-dict entries and missing keys become NaN.
+    """
+    records = [item if isinstance(item, dict) else {} for item in records]
+    return {field: [item.get(field, np.nan) for item in records] for field in fields}
+
+
 def process_iteration_data(data: dict) -> pd.DataFrame:
     """
     Extract iteration-level data from experiment JSON.
@@ -105,19 +170,9 @@ def process_iteration_data(data: dict) -> pd.DataFrame:
             
             # Handle if it's a list of dictionaries
             if isinstance(stage_data, list) and len(stage_data) == iterations:
-                time_graph_values = []
-                ng_graph_values = []
-                
-                for item in stage_data:
-                    if isinstance(item, dict):
-                        time_graph_values.append(item.get('timeGraph', np.nan))
-                        ng_graph_values.append(item.get('ngGraph', np.nan))
-                    else:
-                        time_graph_values.append(np.nan)
-                        ng_graph_values.append(np.nan)
-                
-                results_df[f'{suffix}_timeGraph'] = time_graph_values
-                results_df[f'{suffix}_ngGraph'] = ng_graph_values
+                normalized = normalize_records(stage_data, ['timeGraph', 'ngGraph'])
+                results_df[f'{suffix}_timeGraph'] = normalized['timeGraph']
+                results_df[f'{suffix}_ngGraph'] = normalized['ngGraph']
             else:
                 # Missing or wrong structure
                 results_df[f'{suffix}_timeGraph'] = [np.nan] * iterations
@@ -132,22 +187,10 @@ def process_iteration_data(data: dict) -> pd.DataFrame:
         cut_data = data['cuttingPlaneBendInfo']
         
         if isinstance(cut_data, list) and len(cut_data) == iterations:
-            results_df['cut_tot_cut_value'] = [
-                item.get('tot_cut_value', np.nan) if isinstance(item, dict) else np.nan 
-                for item in cut_data
-            ]
-            results_df['cut_TOT_gen_cut'] = [
-                item.get('TOT_gen_cut', np.nan) if isinstance(item, dict) else np.nan 
-                for item in cut_data
-            ]
-            results_df['cut_tot_time_opt'] = [
-                item.get('tot_time_opt', np.nan) if isinstance(item, dict) else np.nan 
-                for item in cut_data
-            ]
-            results_df['cut_max_time_opt'] = [
-                item.get('max_time_opt', np.nan) if isinstance(item, dict) else np.nan 
-                for item in cut_data
-            ]
+            cut_fields = ['tot_cut_value', 'TOT_gen_cut', 'tot_time_opt', 'max_time_opt']
+            normalized = normalize_records(cut_data, cut_fields)
+            for field in cut_fields:
+                results_df[f'cut_{field}'] = normalized[field]
         else:
             # Missing or wrong structure
             for col in ['cut_tot_cut_value', 'cut_TOT_gen_cut', 'cut_tot_time_opt', 'cut_max_time_opt']:
@@ -165,19 +208,356 @@ def process_iteration_data(data: dict) -> pd.DataFrame:
     else:
         results_df['cumulative_time'] = [np.nan] * iterations
     
+    return annotate_iteration_data(downcast_iteration_data(results_df))
+
+
+def annotate_iteration_data(results_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Precompute per-run scalars used by the plots and store them in results_df.attrs.
+    The disk cache stores them as CACHE_RUN_COLUMNS and restores them on read.
+    """
+    first_cut_iter = None
+    first_cut_cumtime = None
+    
+    if 'cut_TOT_gen_cut' in results_df.columns:
+        cut_rows = np.flatnonzero(results_df['cut_TOT_gen_cut'].fillna(0).to_numpy() > 0)
+        if len(cut_rows):
+            first_cut_iter = int(results_df['iteration'].iloc[cut_rows[0]])
+            first_cut_cumtime = float(results_df['cumulative_time'].iloc[cut_rows[0]])
+    
+    results_df.attrs['first_cut_iter'] = first_cut_iter
+    results_df.attrs['first_cut_cumtime'] = first_cut_cumtime
+    
     return results_df
 
 
+def compute_valid_positions(results_df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Non-null row positions of each plotted column.
+    Kept outside results_df.attrs: pandas compares attrs on concat and
+    Arrow serializes them as JSON, neither of which works with arrays.
+    """
+    return {
+        col: np.flatnonzero(results_df[col].notna().to_numpy())
+        for col in PLOT_COLUMNS if col in results_df.columns
+    }
+
+
+def downcast_iteration_data(results_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Store measured columns as float32 and integer-valued columns as nullable Int32.
+    Halves the memory held by the cache and the payload sent to Plotly.
+    Measurements are float32 even when a file happens to hold only integral
+    values, so every experiment has the same schema.
+    """
+    # Converting NumPy arrays and building one new frame is several times
+    # faster than DataFrame.astype, which converts and re-concats per column
+    columns = {}
+    for col in results_df.columns:
+        values = results_df[col]
+        if col in NULLABLE_INT_COLUMNS:
+            columns[col] = values.astype(nullable_int_dtype(values)).array
+        elif col != 'iteration' and values.dtype.kind in 'fi':
+            columns[col] = values.to_numpy(dtype=np.float32)
+        else:
+            columns[col] = values.to_numpy()
+    
+    return pd.DataFrame(columns, copy=False)
+
+
+def nullable_int_dtype(column: pd.Series) -> str:
+    """
+    Nullable Int32 if every non-null value is an integer in int32 range,
+    otherwise float32, so fractional values are kept rather than failing the cast.
+    """
+    values = column.to_numpy(dtype=np.float64, na_value=np.nan)
+    present = values[~np.isnan(values)]
+    
+    if (np.mod(present, 1) == 0).all() and (np.abs(present) <= np.iinfo(np.int32).max).all():
+        return 'Int32'
+    return 'float32'
+
+
+def get_dataset_metadata(dataset: str) -> Tuple[int, str]:
+    """
+    Derive the customer count and instance type (C1, R2, ...) from a dataset name.
+    """
+    # Extract customer count
+    if "100" in dataset:
+        num_cust = 100
+    elif "50" in dataset:
+        num_cust = 50
+    else:
+        num_cust = 25
+    
+    # Extract instance type
+    instance_type_match = re.match(r'^([CR][12])', dataset)
+    instance_type = instance_type_match.group(1) if instance_type_match else "Unknown"
+    
+    return num_cust, instance_type
+
+
+def _process_one(task: Tuple[str, int, str, str, str, str]) -> Optional[Tuple[dict, pd.DataFrame]]:
+    """
+    Read and process a single experiment file.
+    Returns the summary record and iteration data, or None if it cannot be used.
+    """
+    dataset, num_cust, instance_type, condition, entry_name, file_path = task
+    
+    try:
+        data = read_one_file(file_path)
+        
+        if not data:
+            return None
+        
+        # Extract iteration-level data
+        iteration_data = process_iteration_data(data)
+        
+        # Create summary record
+        record = {
+            'dataset': dataset,
+            'num_cust': num_cust,
+            'instance_type': instance_type,
+            'condition': condition,
+            'instance': extract_instance_name(entry_name),
+            'root_lp': data.get('ROOT_LP_PRIOR_ADDING_CUTS', np.nan),
+            'final_lb': data.get('lblp_lower', [np.nan])[-1] if data.get('lblp_lower') else np.nan,
+            'ilp_objective': data.get('OUR_ilp_objective', np.nan),
+            'ilp_time': data.get('OUR_ilp_time', np.nan),
+            'total_lp_time': sum([
+                sum(data.get('lp_time_LB', [])),
+                sum(data.get('lp_time_project', []))
+            ]),
+            'iterations': len(data.get('lblp_lower', [])),
+            'total_cuts': 0,  # Will calculate from iteration data if needed
+        }
+        
+        # Calculate total cuts
+        if not iteration_data.empty and 'cut_TOT_gen_cut' in iteration_data.columns:
+            record['total_cuts'] = iteration_data['cut_TOT_gen_cut'].fillna(0).sum()
+        
+        return record, iteration_data
+        
+    except Exception as e:
+        print(f"Error processing {file_path}: {e}")
+        return None
+
+
+@contextmanager
+def _plain_main_module():
+    """
+    Temporarily replace the __main__ module with an empty one.
+    Under `streamlit run`, __main__ is the dashboard script, which spawned
+    worker processes would otherwise re-execute while starting up.
+    """
+    main_module = sys.modules['__main__']
+    sys.modules['__main__'] = types.ModuleType('__main__')
+    try:
+        yield
+    finally:
+        sys.modules['__main__'] = main_module
+
+
+def process_files(tasks: list) -> list:
+    """
+    Run _process_one over every task, in worker processes for large batches.
+    Workers are spawned rather than forked: forking Streamlit's multithreaded
+    server process can deadlock on locks held by other threads.
+    """
+    if len(tasks) < MIN_PARALLEL_TASKS:
+        return [_process_one(task) for task in tasks]
+    
+    # JSON parsing holds the GIL, so spread the files across processes
+    mp_context = multiprocessing.get_context('spawn')
+    with _plain_main_module():
+        with ProcessPoolExecutor(mp_context=mp_context) as executor:
+            return list(executor.map(_process_one, tasks, chunksize=8))
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int = MAX_PLOT_POINTS) -> np.ndarray:
+    """
+    Select n_out point positions with Largest-Triangle-Three-Buckets,
+    keeping the visual shape of the curve. Expects no NaNs in x/y.
+    """
+    n = len(x)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    
+    # First and last points are always kept; the rest are split into buckets
+    bucket_size = (n - 2) / (n_out - 2)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    
+    a = 0
+    for i in range(n_out - 2):
+        # Average of the next bucket acts as the third triangle vertex
+        avg_start = int((i + 1) * bucket_size) + 1
+        avg_end = min(int((i + 2) * bucket_size) + 1, n)
+        avg_x = x[avg_start:avg_end].mean()
+        avg_y = y[avg_start:avg_end].mean()
+        
+        # Pick the point in this bucket forming the largest triangle
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    
+    return selected
+
+
+def get_valid_positions(data: pd.DataFrame, columns: List[str],
+                        valid_idx: Optional[Dict[str, np.ndarray]] = None) -> np.ndarray:
+    """
+    Row positions where all columns are non-null, using the positions
+    precomputed by compute_valid_positions where available.
+    """
+    valid_idx = valid_idx or {}
+    positions = None
+    
+    for col in columns:
+        col_positions = valid_idx.get(col)
+        if col_positions is None:
+            col_positions = np.flatnonzero(data[col].notna().to_numpy())
+        
+        if positions is None:
+            positions = col_positions
+        else:
+            positions = np.intersect1d(positions, col_positions, assume_unique=True)
+    
+    return positions
+
+
+# Experiments are keyed by (num_cust, instance, condition), as instance
+# names repeat across customer counts
+ExperimentKey = Tuple[int, str, str]
+IterationMap = Dict[ExperimentKey, pd.DataFrame]
+ValidPositionMap = Dict[ExperimentKey, Dict[str, np.ndarray]]
+
+
+def compute_data_fingerprint(base_path: Path) -> str:
+    """
+    Fingerprint the experiment files under base_path by path and modification time.
+    CACHE_VERSION is part of the payload, so a format change invalidates old caches.
+    """
+    entries = sorted(
+        (str(p.relative_to(base_path)), p.stat().st_mtime)
+        for p in base_path.rglob("*") if p.is_file()
+    )
+    payload = repr((CACHE_VERSION, base_path.stat().st_mtime, entries)).encode('utf-8')
+    return hashlib.sha1(payload).hexdigest()
+
+
+def read_disk_cache(cache_dir: Path, fingerprint: str) -> Optional[Tuple[pd.DataFrame, IterationMap]]:
+    """
+    Load previously processed data (Parquet summary + one long-format
+    Parquet table of all iteration frames, split back per experiment).
+    Returns None if there is no usable cache for this fingerprint.
+    """
+    summary_path = cache_dir / f"{fingerprint}.parquet"
+    iter_path = cache_dir / f"{fingerprint}.iterations.parquet"
+    
+    if not (summary_path.exists() and iter_path.exists()):
+        return None
+    
+    try:
+        summary_df = pd.read_parquet(summary_path)
+        iterations = pd.read_parquet(iter_path)
+        iter_map = {}
+        
+        # Int32 columns that were float32 for some experiment come back as
+        # Float64; only those are narrowed again, per experiment as on load
+        mixed_cols = [
+            col for col in NULLABLE_INT_COLUMNS
+            if col in iterations.columns and iterations[col].dtype != 'Int32'
+        ]
+        
+        # Stored dtypes are already downcast, so frames are otherwise used as read
+        for (num_cust, instance, condition), group in iterations.groupby(CACHE_KEY_COLUMNS, sort=False):
+            first_cut_iter, first_cut_cumtime = group[CACHE_RUN_COLUMNS].iloc[0]
+            iteration_data = group.drop(columns=CACHE_KEY_COLUMNS + CACHE_RUN_COLUMNS).reset_index(drop=True)
+            iteration_data.attrs['first_cut_iter'] = None if pd.isna(first_cut_iter) else int(first_cut_iter)
+            iteration_data.attrs['first_cut_cumtime'] = None if pd.isna(first_cut_cumtime) else float(first_cut_cumtime)
+            if mixed_cols:
+                iteration_data = iteration_data.astype(
+                    {col: nullable_int_dtype(iteration_data[col]) for col in mixed_cols}
+                )
+            iter_map[(int(num_cust), instance, condition)] = iteration_data
+        return summary_df, iter_map
+    except Exception as e:
+        print(f"Warning: could not read cache {summary_path}: {e}")
+        return None
+
+
+def write_disk_cache(cache_dir: Path, fingerprint: str, summary_df: pd.DataFrame, iter_map: IterationMap) -> None:
+    """
+    Persist processed data for reuse across server restarts, replacing older caches.
+    """
+    summary_path = cache_dir / f"{fingerprint}.parquet"
+    iter_path = cache_dir / f"{fingerprint}.iterations.parquet"
+    
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        # *.h5 files are left over from the earlier HDF5 cache format
+        for stale in list(cache_dir.glob("*.parquet")) + list(cache_dir.glob("*.h5")):
+            stale.unlink()
+        
+        summary_df.to_parquet(summary_path, index=False)
+        
+        # One long-format table; the attrs scalars ride along as columns
+        frames = []
+        for (num_cust, instance, condition), iteration_data in iter_map.items():
+            if iteration_data.empty:
+                continue
+            run_values = {col: iteration_data.attrs.get(col) for col in CACHE_RUN_COLUMNS}
+            frames.append(iteration_data.assign(
+                num_cust=num_cust, instance=instance, condition=condition,
+                **{col: np.nan if value is None else value for col, value in run_values.items()}
+            ))
+        pd.concat(frames, ignore_index=True).to_parquet(iter_path, index=False)
+    except Exception as e:
+        print(f"Warning: could not write cache to {cache_dir}: {e}")
+        # Never leave a half-written cache behind
+        summary_path.unlink(missing_ok=True)
+        iter_path.unlink(missing_ok=True)
+
+
+def build_valid_position_map(iter_map: IterationMap) -> ValidPositionMap:
+    """
+    Precompute non-null positions for every iteration DataFrame in iter_map.
+    """
+    return {key: compute_valid_positions(iteration_data) for key, iteration_data in iter_map.items()}
+
+
 @st.cache_data
-def load_ablation_data(base_dir: str = "data/WillRezAbl") -> pd.DataFrame:
+def load_ablation_data(base_dir: str = "data/WillRezAbl") -> Tuple[pd.DataFrame, pd.DataFrame, IterationMap, ValidPositionMap]:
     """
     Load and process all ablation experiment data.
+    
+    Returns a flat summary DataFrame (one row per experiment), the same
+    summary indexed for lookups by index_summary, a mapping from
+    (num_cust, instance, condition) to the iteration-level DataFrame, and a
+    mapping with the same keys to the non-null positions of its plotted columns.
     """
     base_path = Path(base_dir)
     
     if not base_path.exists():
         st.error(f"Base directory {base_dir} does not exist")
-        return pd.DataFrame()
+        return pd.DataFrame(), pd.DataFrame(), {}, {}
+    
+    # Reuse the processed data from disk if no experiment file has changed
+    fingerprint = compute_data_fingerprint(base_path)
+    cache_dir = base_path.parent / ".cache"
+    cached = read_disk_cache(cache_dir, fingerprint)
+    if cached is not None:
+        summary_df, iter_map = cached
+        return summary_df, index_summary(summary_df), iter_map, build_valid_position_map(iter_map)
     
     # Define datasets and conditions
     datasets = [
@@ -190,7 +570,11 @@ def load_ablation_data(base_dir: str = "data/WillRezAbl") -> pd.DataFrame:
     
     base_conditions = ["normal", "cuts_off_graphs_on", "cuts_off_graph_on", "no_ub_use_remove", "no_cuts_or_graphs"]
     
-    all_results = []
+    # Customer count and instance type depend only on the dataset
+    dataset_meta = {dataset: get_dataset_metadata(dataset) for dataset in datasets}
+    
+    # Collect every experiment file first so they can be processed in parallel
+    tasks = []
     
     for dataset in datasets:
         dataset_dir = base_path / dataset
@@ -200,88 +584,66 @@ def load_ablation_data(base_dir: str = "data/WillRezAbl") -> pd.DataFrame:
             continue
         
         # Get available conditions for this dataset
-        available_conditions = [d.name for d in dataset_dir.iterdir() if d.is_dir()]
+        with os.scandir(dataset_dir) as it:
+            available_conditions = [entry.name for entry in it if entry.is_dir()]
         conditions_to_process = [c for c in base_conditions if c in available_conditions]
         
         for condition in conditions_to_process:
             condition_dir = dataset_dir / condition
             
-            if not condition_dir.exists():
-                print(f"Warning: Directory {condition_dir} not found")
-                continue
+            # Find all files/directories starting with jy_; DirEntry caches
+            # the file type from the directory read, so no extra stat calls
+            with os.scandir(condition_dir) as it:
+                entries = [entry for entry in it if entry.name.startswith("jy_")]
+            print(f"Processing {dataset}/{condition}: found {len(entries)} files")
+            task_prefix = (dataset, *dataset_meta[dataset], condition)
             
-            # Find all files/directories starting with jy_
-            files = list(condition_dir.glob("jy_*"))
-            print(f"Processing {dataset}/{condition}: found {len(files)} files")
-            
-            for file_path in files:
-                try:
-                    # Handle both files and directories
-                    if file_path.is_file():
-                        data = read_one_file(file_path)
-                    elif file_path.is_dir():
-                        # Look for JSON files inside
-                        json_files = list(file_path.glob("*.json")) + list(file_path.glob("*.txt"))
-                        if json_files:
-                            data = read_one_file(json_files[0])
-                        else:
-                            continue
-                    else:
-                        continue
-                    
-                    if not data:
-                        continue
-                    
-                    # Extract iteration-level data
-                    iteration_data = process_iteration_data(data)
-                    
-                    # Extract customer count
-                    if "100" in dataset:
-                        num_cust = 100
-                    elif "50" in dataset:
-                        num_cust = 50
-                    else:
-                        num_cust = 25
-                    
-                    # Extract instance type
-                    instance_type_match = re.match(r'^([CR][12])', dataset)
-                    instance_type = instance_type_match.group(1) if instance_type_match else "Unknown"
-                    
-                    # Create summary record
-                    record = {
-                        'dataset': dataset,
-                        'num_cust': num_cust,
-                        'instance_type': instance_type,
-                        'condition': condition,
-                        'instance': extract_instance_name(file_path.name),
-                        'root_lp': data.get('ROOT_LP_PRIOR_ADDING_CUTS', np.nan),
-                        'final_lb': data.get('lblp_lower', [np.nan])[-1] if data.get('lblp_lower') else np.nan,
-                        'ilp_objective': data.get('OUR_ilp_objective', np.nan),
-                        'ilp_time': data.get('OUR_ilp_time', np.nan),
-                        'total_lp_time': sum([
-                            sum(data.get('lp_time_LB', [])),
-                            sum(data.get('lp_time_project', []))
-                        ]),
-                        'iterations': len(data.get('lblp_lower', [])),
-                        'total_cuts': 0,  # Will calculate from iteration data if needed
-                        'iteration_data': iteration_data
-                    }
-                    
-                    # Calculate total cuts
-                    if not iteration_data.empty and 'cut_TOT_gen_cut' in iteration_data.columns:
-                        record['total_cuts'] = iteration_data['cut_TOT_gen_cut'].fillna(0).sum()
-                    
-                    all_results.append(record)
-                    
-                except Exception as e:
-                    print(f"Error processing {file_path}: {e}")
-                    continue
-    
-    if not all_results:
+            for entry in entries:
+                # Handle both files and directories
+                if entry.is_file():
+                    tasks.append((*task_prefix, entry.name, entry.path))
+                elif entry.is_dir():
+                    # Look for JSON files inside
+                    entry_dir = Path(entry.path)
+                    json_files = list(entry_dir.glob("*.json")) + list(entry_dir.glob("*.txt"))
+                    if json_files:
+                        tasks.append((*task_prefix, entry.name, str(json_files[0])))
+    
+    results = process_files(tasks)
+    
+    # Build the summary column-wise so each column gets its dtype directly
+    columns = {name: [] for name in SUMMARY_DTYPES}
+    iter_map = {}
+    
+    for result in results:
+        if result is None:
+            continue
+        
+        record, iteration_data = result
+        for name, values in columns.items():
+            values.append(record[name])
+        # First match wins if an experiment appears twice (file and directory)
+        iter_map.setdefault((record['num_cust'], record['instance'], record['condition']), iteration_data)
+    
+    if not columns['instance']:
         st.error("No data loaded successfully")
-        return pd.DataFrame()
+        return pd.DataFrame(), pd.DataFrame(), {}, {}
+    
+    summary_df = pd.DataFrame({
+        name: pd.Series(values, dtype=SUMMARY_DTYPES[name])
+        for name, values in columns.items()
+    })
+    write_disk_cache(cache_dir, fingerprint, summary_df, iter_map)
     
-    return pd.DataFrame(all_results)
+    return summary_df, index_summary(summary_df), iter_map, build_valid_position_map(iter_map)
+
+
+def index_summary(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Index the summary DataFrame by (num_cust, instance, condition) for direct lookups.
+    Built once at load time rather than on every lookup.
+    """
+    return df.set_index(['num_cust', 'instance', 'condition']).sort_index()
 
 
 def get_available_instances(df: pd.DataFrame, num_cust: int, condition: str) -> List[str]:
@@ -292,17 +654,11 @@ def get_available_instances(df: pd.DataFrame, num_cust: int, condition: str) ->
     return sorted(filtered['instance'].unique())
 
 
-def get_iteration_data(df: pd.DataFrame, instance: str, condition: str) -> Optional[pd.DataFrame]:
+def get_iteration_data(iter_map: IterationMap, num_cust: int, instance: str, condition: str) -> Optional[pd.DataFrame]:
     """
-    Get iteration-level data for a specific instance and condition.
+    Get iteration-level data for a specific customer count, instance and condition.
     """
-    filtered = df[(df['instance'] == instance) & (df['condition'] == condition)]
-    
-    if filtered.empty:
-        return None
-    
-    # Get the first match (should be unique)
-    iteration_data = filtered.iloc[0]['iteration_data']
+    iteration_data = iter_map.get((num_cust, instance, condition))
     
     if isinstance(iteration_data, pd.DataFrame) and not iteration_data.empty:
         return iteration_data
@@ -310,33 +666,61 @@ def get_iteration_data(df: pd.DataFrame, instance: str, condition: str) -> Optio
         return None
 
 
-def get_summary_stats(df: pd.DataFrame, instance: str, condition: str) -> Dict[str, float]:
+@st.cache_data
+def build_comparison_frame(_iter_map: IterationMap, _valid_map: ValidPositionMap,
+                           num_cust: int, instance: str, conditions: Tuple[str, ...]) -> pd.DataFrame:
+    """
+    Collect the LP lower bound trace of each condition for one instance into a
+    single long-format DataFrame with a 'condition' column, in the given order.
+    """
+    frames = []
+    
+    for condition in conditions:
+        comp_data = get_iteration_data(_iter_map, num_cust, instance, condition)
+        if comp_data is not None:
+            valid = get_valid_positions(
+                comp_data, ['lblp_lower', 'iteration'], _valid_map.get((num_cust, instance, condition))
+            )
+            if len(valid):
+                x = comp_data['iteration'].to_numpy(dtype=np.float32)[valid]
+                lb = comp_data['lblp_lower'].to_numpy(dtype=np.float32)[valid]
+                keep = lttb_indices(x, lb)
+                frames.append(pd.DataFrame({
+                    'iteration': x[keep],
+                    'lblp_lower': lb[keep],
+                    'condition': condition
+                }))
+    
+    if not frames:
+        return pd.DataFrame(columns=['iteration', 'lblp_lower', 'condition'])
+    
+    return pd.concat(frames, ignore_index=True)
+
+
+def get_summary_stats(summary_index: pd.DataFrame, iter_map: IterationMap,
+                      num_cust: int, instance: str, condition: str) -> Dict[str, float]:
     """
-    Get summary statistics for an instance and condition.
+    Get summary statistics for a customer count, instance and condition.
+    summary_index is the indexed summary returned by load_ablation_data.
     """
-    filtered = df[(df['instance'] == instance) & (df['condition'] == condition)]
+    key = (num_cust, instance, condition)
     
-    if filtered.empty:
+    if key not in summary_index.index:
         return {}
     
-    row = filtered.iloc[0]
-    iteration_data = row['iteration_data']
-    
-    stats = {
-        'Root LP': row.get('root_lp', np.nan),
-        'Final LB': row.get('final_lb', np.nan),
-        'ILP Objective': row.get('ilp_objective', np.nan),
-        'ILP Time': row.get('ilp_time', np.nan),
-        'Total LP Time': row.get('total_lp_time', np.nan),
-        'Iterations': row.get('iterations', 0),
-        'Total Cuts': row.get('total_cuts', 0)
-    }
+    # Get the first match if the experiment was loaded twice
+    row = summary_index.loc[[key]].iloc[0]
+    iteration_data = iter_map.get(key)
+    
+    # Pull every scalar in one call, then rename to display labels
+    values = row[list(SUMMARY_STAT_LABELS)].to_dict()
+    stats = {label: values[col] for col, label in SUMMARY_STAT_LABELS.items()}
     
     # Add iteration-level statistics if available
-    if isinstance(iteration_data, pd.DataFrame) and not iteration_data.empty:
-        if 'lblp_lower' in iteration_data.columns:
-            bounds = iteration_data['lblp_lower'].dropna()
-            if not bounds.empty:
-                stats['LB Improvement'] = bounds.iloc[-1] - bounds.iloc[0]
+    if isinstance(iteration_data, pd.DataFrame) and 'lblp_lower' in iteration_data.columns:
+        bounds = iteration_data['lblp_lower'].to_numpy(dtype=np.float64)
+        bounds = bounds[~np.isnan(bounds)]
+        if len(bounds):
+            stats['LB Improvement'] = bounds[-1] - bounds[0]
     
     return stats